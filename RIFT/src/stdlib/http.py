@@ -11,15 +11,231 @@ import asyncio
 import time
 import hashlib
 import base64
-import secrets
 from typing import Any, Dict, List, Optional, Callable, Tuple
-from urllib.parse import parse_qs, urlparse, quote, unquote
-from http.server import HTTPServer, BaseHTTPRequestHandler
-from http.cookies import SimpleCookie
-from collections import defaultdict
+from urllib.parse import parse_qs, urlparse, urljoin, quote, unquote
+from http.client import HTTPConnection, HTTPSConnection, HTTPException
+from http.server import HTTPServer, ThreadingHTTPServer, BaseHTTPRequestHandler
+from collections import defaultdict, deque
 import threading
 import mimetypes
 import os
+import weakref
+
+# Fixed GUID from RFC 6455; appended to the client key before hashing.
+_WS_MAGIC = b'258EAFA5-E914-47DA-95CA-C5AB0DC85B11'
+
+# Compiled once at import; per-part multipart header fields are matched
+# on raw bytes so binary upload headers are never decoded wholesale.
+_BOUNDARY_RE = re.compile(r'boundary=([^;]+)')
+_DISP_RE = re.compile(
+    rb'name="(?P<name>[^"]+)"(?:; filename="(?P<filename>[^"]+)")?',
+    re.IGNORECASE)
+_CT_RE = re.compile(rb'Content-Type:\s*([^\r\n]+)', re.IGNORECASE)
+
+# :param placeholders in route paths
+_PATH_PARAM_RE = re.compile(r':(\w+)')
+
+# Pre-encoded status portions for the responses the server sends most,
+# so the hot path formats no f-strings at all.
+_COMMON_STATUS = {
+    200: b'200 OK',
+    204: b'204 No Content',
+    302: b'302 Found',
+    404: b'404 Not Found',
+    500: b'500 Internal Server Error',
+}
+
+# Methods safe to resend after a mid-flight failure (RFC 9110 §9.2.2).
+_IDEMPOTENT_METHODS = frozenset({
+    'GET', 'HEAD', 'PUT', 'DELETE', 'OPTIONS', 'TRACE'})
+
+# Free list of request-body buffers, reused across requests to avoid a
+# fresh allocation per upload. deque append/pop are atomic, so no lock.
+_BODY_BUFFERS: deque = deque(maxlen=32)
+
+# Buffers above this size are dropped on return rather than pooled, so
+# one large upload can't pin a big bytearray for the process's life.
+_MAX_POOLED_BUFFER = 1 << 20  # 1 MiB
+
+# Declared Content-Length is allocated up front, so cap what a client
+# can ask for before trusting it.
+_MAX_BODY_SIZE = 64 << 20  # 64 MiB
+
+
+def _rent_body_buffer(size: int) -> bytearray:
+    """Take a bytearray of at least `size` bytes from the pool."""
+    try:
+        buf = _BODY_BUFFERS.pop()
+        if len(buf) >= size:
+            return buf
+    except IndexError:
+        pass
+    # Round up to the next power of two so buffers get reused broadly.
+    return bytearray(max(8192, 1 << (size - 1).bit_length()))
+
+
+def _return_body_buffer(buf: bytearray) -> None:
+    """Put a buffer back; the deque's maxlen bounds pool memory."""
+    if len(buf) <= _MAX_POOLED_BUFFER:
+        _BODY_BUFFERS.append(buf)
+
+
+class _ClientPool:
+    """Keep-alive pool of client connections, keyed by origin.
+
+    Repeated requests to the same (scheme, host, port) reuse an open
+    socket instead of paying a TCP (and for https, TLS) handshake per
+    call. Idle connections per origin are capped; overflow is closed.
+    """
+
+    def __init__(self, maxsize: int = 8):
+        self._idle: Dict[Tuple[str, str, int], deque] = {}
+        self._lock = threading.Lock()
+        self._maxsize = maxsize
+
+    def acquire(self, scheme: str, host: str, port: int, timeout: float):
+        """Return (connection, reused) for the origin.
+
+        `reused` is True when the connection came from the pool, so the
+        caller can tell a possibly-stale keep-alive socket from a fresh
+        one.
+        """
+        with self._lock:
+            bucket = self._idle.get((scheme, host, port))
+            if bucket:
+                conn = bucket.popleft()
+                # conn.timeout only applies at connect(); a pooled
+                # connection's socket needs the new deadline directly.
+                conn.timeout = timeout
+                if conn.sock is not None:
+                    conn.sock.settimeout(timeout)
+                return conn, True
+        if scheme == 'https':
+            return HTTPSConnection(host, port, timeout=timeout), False
+        return HTTPConnection(host, port, timeout=timeout), False
+
+    def release(self, scheme: str, host: str, port: int, conn) -> None:
+        """Park a still-open connection for reuse."""
+        with self._lock:
+            bucket = self._idle.setdefault((scheme, host, port), deque())
+            if len(bucket) < self._maxsize:
+                bucket.append(conn)
+                return
+        conn.close()
+
+
+_CLIENT_POOL = _ClientPool()
+
+
+try:
+    import numpy as _np
+except ImportError:  # NumPy is optional; the big-int fallback is still fast
+    _np = None
+
+try:
+    import orjson as _orjson
+
+    def _json_loads(data) -> Any:
+        """Decode JSON from str/bytes/memoryview without an extra copy."""
+        return _orjson.loads(data)
+
+    def _json_dumps(obj) -> bytes:
+        """Encode JSON straight to bytes."""
+        try:
+            return _orjson.dumps(obj)
+        except TypeError:
+            # orjson rejects ints outside 64 bits, but RIFT numbers are
+            # arbitrary-precision; let the stdlib encoder handle those.
+            return json.dumps(obj).encode('utf-8')
+except ImportError:  # fall back to the stdlib encoder
+    def _json_loads(data) -> Any:
+        if isinstance(data, memoryview):
+            data = bytes(data)
+        return json.loads(data)
+
+    def _json_dumps(obj) -> bytes:
+        return json.dumps(obj).encode('utf-8')
+
+
+class _LazyRequest(dict):
+    """Request mapping that builds expensive fields on first access.
+
+    Route handlers are RIFT conduits receiving a single request map, so
+    there is no Python signature to inspect for a per-route specialized
+    parser. Deferring the fields most handlers never read (the headers
+    copy, cookie parsing) gets the same effect at run time: a handler
+    that only touches `params` and `body` never pays for the rest.
+    """
+
+    __slots__ = ('_pending',)
+
+    def __init__(self, base: Dict, pending: Dict[str, Callable]):
+        super().__init__(base)
+        self._pending = pending
+
+    def _force_all(self) -> None:
+        while self._pending:
+            key, factory = self._pending.popitem()
+            dict.__setitem__(self, key, factory())
+
+    def __missing__(self, key):
+        factory = self._pending.pop(key, None)
+        if factory is None:
+            raise KeyError(key)
+        value = factory()
+        dict.__setitem__(self, key, value)
+        return value
+
+    def __contains__(self, key):
+        return dict.__contains__(self, key) or key in self._pending
+
+    def __iter__(self):
+        self._force_all()
+        return dict.__iter__(self)
+
+    def __len__(self):
+        return dict.__len__(self) + len(self._pending)
+
+    def get(self, key, default=None):
+        if dict.__contains__(self, key) or key in self._pending:
+            return self[key]
+        return default
+
+    def keys(self):
+        self._force_all()
+        return dict.keys(self)
+
+    def values(self):
+        self._force_all()
+        return dict.values(self)
+
+    def items(self):
+        self._force_all()
+        return dict.items(self)
+
+    def copy(self):
+        self._force_all()
+        return dict(self)
+
+
+def _ws_unmask(data: bytearray, mask: bytes) -> None:
+    """XOR-unmask a WebSocket payload in place.
+
+    The naive byte-at-a-time Python loop dominates CPU time on large
+    frames. With NumPy installed the payload is unmasked with a single
+    vectorized uint8 XOR; otherwise the whole buffer is XORed as one big
+    integer, which runs the pass in C instead of the interpreter loop.
+    """
+    n = len(data)
+    if n == 0:
+        return
+    if _np is not None and n >= 512:
+        arr = _np.frombuffer(data, dtype=_np.uint8)
+        arr ^= _np.resize(_np.frombuffer(mask, dtype=_np.uint8), n)
+        return
+    full_mask = mask * (n // 4) + mask[:n % 4]
+    data[:] = (int.from_bytes(data, 'little') ^
+               int.from_bytes(full_mask, 'little')).to_bytes(n, 'little')
 
 
 def create_http_module(interpreter) -> Dict[str, Any]:
@@ -39,30 +255,35 @@ def create_http_module(interpreter) -> Dict[str, Any]:
         
         def create(self, data: Dict = None) -> str:
             """Create new session."""
-            session_id = secrets.token_urlsafe(32)
-            with self._lock:
-                self._sessions[session_id] = {
-                    'data': data or {},
-                    'created_at': time.time(),
-                    'last_accessed': time.time()
-                }
+            # Same entropy as secrets.token_urlsafe(32) without the extra
+            # wrapper layer: 32 random bytes, base64url, padding stripped.
+            session_id = base64.urlsafe_b64encode(
+                os.urandom(32)
+            ).rstrip(b'=').decode('ascii')
+            # Single dict store is atomic under CPython; no lock needed.
+            self._sessions[session_id] = {
+                'data': data or {},
+                'created_at': time.time(),
+                'last_accessed': time.time()
+            }
             return session_id
-        
+
         def get(self, session_id: str) -> Optional[Dict]:
             """Get session data."""
-            with self._lock:
-                if session_id not in self._sessions:
-                    return None
-                
-                session = self._sessions[session_id]
-                
-                # Check TTL
-                if time.time() - session['last_accessed'] > self._ttl:
-                    del self._sessions[session_id]
-                    return None
-                
-                session['last_accessed'] = time.time()
-                return session['data']
+            # dict.get is atomic, so the common hit path is lock-free;
+            # the lock is only taken to expire a stale entry.
+            session = self._sessions.get(session_id)
+            if session is None:
+                return None
+
+            # Check TTL
+            if time.time() - session['last_accessed'] > self._ttl:
+                with self._lock:
+                    self._sessions.pop(session_id, None)
+                return None
+
+            session['last_accessed'] = time.time()
+            return session['data']
         
         def set(self, session_id: str, data: Dict) -> bool:
             """Update session data."""
@@ -100,33 +321,105 @@ def create_http_module(interpreter) -> Dict[str, Any]:
         def __init__(self, max_requests: int, window: int):
             self._max_requests = max_requests
             self._window = window
-            self._requests: Dict[str, List[float]] = defaultdict(list)
-            self._lock = threading.Lock()
-        
+            # Timestamps per key, oldest first. Appends are monotonic, so
+            # expiry is popping from the left — no per-call list rebuild.
+            self._requests: Dict[str, deque] = defaultdict(deque)
+            # Locks sharded by key hash so unrelated clients never
+            # serialize on one global lock.
+            self._locks = [threading.Lock() for _ in range(256)]
+            self._schedule_sweep()
+
+        def _lock_for(self, key: str) -> threading.Lock:
+            """Pick the shard lock for a key."""
+            return self._locks[hash(key) & 255]
+
+        def _purge_locked(self, bucket: deque, now: float) -> None:
+            """Drop timestamps outside the window; caller holds the lock."""
+            while bucket and now - bucket[0] >= self._window:
+                bucket.popleft()
+
+        def _schedule_sweep(self) -> None:
+            """Arm the periodic sweep that drops idle keys.
+
+            The timer holds only a weak reference to the limiter, so a
+            dropped (or replaced) limiter gets collected and its sweep
+            chain ends instead of re-arming forever.
+            """
+            ref = weakref.ref(self)
+
+            def sweep():
+                limiter = ref()
+                if limiter is not None:
+                    limiter._sweep()
+
+            timer = threading.Timer(60.0, sweep)
+            timer.daemon = True
+            timer.start()
+
+        def _sweep(self) -> None:
+            """Purge every bucket and forget empty ones.
+
+            Keys are only appended while under the limit, so buckets are
+            bounded, but one-off clients would otherwise leave an entry
+            in the dict forever.
+            """
+            now = time.time()
+            for key in list(self._requests.keys()):
+                with self._lock_for(key):
+                    bucket = self._requests.get(key)
+                    if bucket is not None:
+                        self._purge_locked(bucket, now)
+                        if not bucket:
+                            del self._requests[key]
+            self._schedule_sweep()
+
         def is_allowed(self, key: str) -> bool:
             """Check if request is allowed."""
             now = time.time()
-            
-            with self._lock:
-                # Remove old requests outside window
-                self._requests[key] = [t for t in self._requests[key]
-                                      if now - t < self._window]
-                
-                # Check if under limit
-                if len(self._requests[key]) < self._max_requests:
-                    self._requests[key].append(now)
+
+            with self._lock_for(key):
+                bucket = self._requests[key]
+
+                # Pigeonhole fast path: purging can only shrink the
+                # bucket, so under the limit means allowed regardless.
+                if len(bucket) < self._max_requests:
+                    bucket.append(now)
                     return True
-                
+
+                self._purge_locked(bucket, now)
+                if len(bucket) < self._max_requests:
+                    bucket.append(now)
+                    return True
+
                 return False
-        
+
         def remaining(self, key: str) -> int:
             """Get remaining requests."""
             now = time.time()
-            
-            with self._lock:
-                self._requests[key] = [t for t in self._requests[key]
-                                      if now - t < self._window]
-                return max(0, self._max_requests - len(self._requests[key]))
+
+            with self._lock_for(key):
+                bucket = self._requests[key]
+                self._purge_locked(bucket, now)
+                return max(0, self._max_requests - len(bucket))
+
+        def check(self, key: str) -> Tuple[bool, int]:
+            """Record a request and report the remaining quota.
+
+            Equivalent to is_allowed() followed by remaining(), but in a
+            single lock acquisition and window purge — use this when a
+            handler also wants to emit an X-RateLimit-Remaining header.
+            """
+            now = time.time()
+
+            with self._lock_for(key):
+                bucket = self._requests[key]
+                self._purge_locked(bucket, now)
+
+                if len(bucket) < self._max_requests:
+                    bucket.append(now)
+                    return True, self._max_requests - len(bucket)
+
+                return False, 0
     
     # ========================================================================
     # CORS Handler
@@ -135,34 +428,38 @@ def create_http_module(interpreter) -> Dict[str, Any]:
     class CORSHandler:
         """CORS (Cross-Origin Resource Sharing) handler."""
         
-        def __init__(self, origins='*', methods=None, headers=None, 
+        def __init__(self, origins='*', methods=None, headers=None,
                      credentials=False, max_age=86400):
             self.origins = origins if isinstance(origins, list) else [origins]
             self.methods = methods or ['GET', 'POST', 'PUT', 'DELETE', 'PATCH', 'OPTIONS']
             self.headers = headers or ['Content-Type', 'Authorization']
             self.credentials = credentials
             self.max_age = max_age
-        
+
+            # Everything except the origin is fixed at construction, so
+            # join/str once here instead of on every request.
+            self._origin_set = frozenset(self.origins)
+            self._allow_any_origin = '*' in self._origin_set
+            self._base_headers = {
+                'Access-Control-Allow-Methods': ', '.join(self.methods),
+                'Access-Control-Allow-Headers': ', '.join(self.headers),
+                'Access-Control-Max-Age': str(self.max_age),
+            }
+            if self.credentials:
+                self._base_headers['Access-Control-Allow-Credentials'] = 'true'
+
         def add_headers(self, request_origin: str = None) -> Dict[str, str]:
             """Generate CORS headers."""
-            headers = {}
-            
+            headers = self._base_headers.copy()
+
             # Handle origin
-            if '*' in self.origins:
+            if self._allow_any_origin:
                 headers['Access-Control-Allow-Origin'] = '*'
-            elif request_origin and request_origin in self.origins:
+            elif request_origin and request_origin in self._origin_set:
                 headers['Access-Control-Allow-Origin'] = request_origin
             elif self.origins:
                 headers['Access-Control-Allow-Origin'] = self.origins[0]
-            
-            # Methods and headers
-            headers['Access-Control-Allow-Methods'] = ', '.join(self.methods)
-            headers['Access-Control-Allow-Headers'] = ', '.join(self.headers)
-            headers['Access-Control-Max-Age'] = str(self.max_age)
-            
-            if self.credentials:
-                headers['Access-Control-Allow-Credentials'] = 'true'
-            
+
             return headers
     
     # ========================================================================
@@ -171,7 +468,9 @@ def create_http_module(interpreter) -> Dict[str, Any]:
     
     class WebSocketConnection:
         """WebSocket connection handler."""
-        
+
+        _CLOSE_FRAME = b'\x88\x00'
+
         def __init__(self, handler, request):
             self.handler = handler
             self.request = request
@@ -183,11 +482,13 @@ def create_http_module(interpreter) -> Dict[str, Any]:
             if not key:
                 return False
             
-            # WebSocket handshake
-            magic = '258EAFA5-E914-47DA-95CA-C5AB0DC85B11'
+            # WebSocket handshake: hash key+magic as one contiguous bytes
+            # buffer so OpenSSL digests it in a single update. Not a
+            # security use, so let FIPS builds keep their fast SHA-1.
             accept = base64.b64encode(
-                hashlib.sha1((key + magic).encode()).digest()
-            ).decode()
+                hashlib.sha1(key.encode('ascii') + _WS_MAGIC,
+                             usedforsecurity=False).digest()
+            ).decode('ascii')
             
             self.handler.send_response(101)
             self.handler.send_header('Upgrade', 'websocket')
@@ -204,22 +505,32 @@ def create_http_module(interpreter) -> Dict[str, Any]:
                 return False
             
             data = message.encode('utf-8')
-            header = bytearray([0x81])  # Text frame
-            
+
+            # Build the header as one immutable bytes object (0x81 = text
+            # frame) instead of growing a bytearray byte by byte.
             length = len(data)
             if length <= 125:
-                header.append(length)
+                header = bytes((0x81, length))
             elif length <= 65535:
-                header.append(126)
-                header.extend(length.to_bytes(2, 'big'))
+                header = b'\x81\x7e' + length.to_bytes(2, 'big')
             else:
-                header.append(127)
-                header.extend(length.to_bytes(8, 'big'))
-            
+                header = b'\x81\x7f' + length.to_bytes(8, 'big')
+
             try:
-                self.handler.wfile.write(header + data)
+                if hasattr(self.handler.connection, 'sendmsg'):
+                    # Scatter-gather write: header and payload go out in a
+                    # single syscall without concatenating into a new buffer.
+                    # A partial send would desynchronize the framing, so
+                    # drain whatever sendmsg left behind.
+                    sent = self.handler.connection.sendmsg([header, data])
+                    total = len(header) + length
+                    if sent < total:
+                        rest = memoryview(header + data)[sent:]
+                        self.handler.connection.sendall(rest)
+                else:
+                    self.handler.wfile.write(header + data)
                 return True
-            except:
+            except OSError:  # covers BrokenPipeError/ConnectionResetError
                 self.connected = False
                 return False
         
@@ -243,10 +554,9 @@ def create_http_module(interpreter) -> Dict[str, Any]:
                     mask = self.handler.rfile.read(4)
                 
                 data = bytearray(self.handler.rfile.read(length))
-                
+
                 if masked:
-                    for i in range(length):
-                        data[i] ^= mask[i % 4]
+                    _ws_unmask(data, mask)
                 
                 if opcode == 0x01:  # Text frame
                     return data.decode('utf-8')
@@ -255,16 +565,19 @@ def create_http_module(interpreter) -> Dict[str, Any]:
                     return None
                 
                 return None
-            except:
+            except (OSError, UnicodeDecodeError):
+                # Socket errors and malformed text frames both end the
+                # connection; anything else (KeyboardInterrupt, bugs)
+                # should propagate rather than be swallowed here.
                 self.connected = False
                 return None
-        
+
         def close(self):
             """Close WebSocket connection."""
             if self.connected:
                 try:
-                    self.handler.wfile.write(bytearray([0x88, 0x00]))
-                except:
+                    self.handler.wfile.write(self._CLOSE_FRAME)
+                except OSError:
                     pass
                 self.connected = False
     
@@ -276,7 +589,9 @@ def create_http_module(interpreter) -> Dict[str, Any]:
         """Advanced HTTP server for RIFT applications."""
         
         def __init__(self):
-            self._routes: List[Tuple[str, List[str], Any, str]] = []
+            self._routes: List[Tuple[re.Pattern, frozenset, Any, str]] = []
+            self._route_trie: Dict = {}
+            self._trie_dirty = False
             self._middleware: List[Any] = []
             self._static_routes: Dict[str, str] = {}
             self._error_handlers: Dict[int, Any] = {}
@@ -290,8 +605,10 @@ def create_http_module(interpreter) -> Dict[str, Any]:
         
         def route(self, path: str, methods: List[str], handler) -> None:
             """Register a route with multiple methods."""
-            pattern = self._path_to_regex(path)
-            self._routes.append((pattern, [m.upper() for m in methods], handler, path))
+            pattern = re.compile(self._path_to_regex(path))
+            self._routes.append(
+                (pattern, frozenset(m.upper() for m in methods), handler, path))
+            self._trie_dirty = True
         
         def get(self, path: str, handler) -> None:
             """Register GET route."""
@@ -368,100 +685,182 @@ def create_http_module(interpreter) -> Dict[str, Any]:
         def _path_to_regex(self, path: str) -> str:
             """Convert path with params to regex."""
             # Replace :param with named capture group
-            pattern = re.sub(r':(\w+)', r'(?P<\1>[^/]+)', path)
+            pattern = _PATH_PARAM_RE.sub(r'(?P<\1>[^/]+)', path)
             return f'^{pattern}$'
         
+        def _build_route_trie(self) -> None:
+            """Rebuild the segment trie from the registered routes.
+
+            Each node maps a literal path segment to a child node; ':'
+            holds the wildcard child for :param segments and None holds
+            the leaf entries, ordered as the routes were registered.
+            """
+            trie: Dict = {}
+            for _pattern, methods, handler, original_path in self._routes:
+                node = trie
+                param_names = []
+                for segment in original_path.split('/'):
+                    if segment.startswith(':') and len(segment) > 1:
+                        param_names.append(segment[1:])
+                        node = node.setdefault(':', {})
+                    else:
+                        node = node.setdefault(segment, {})
+                node.setdefault(None, []).append(
+                    (methods, handler, tuple(param_names)))
+            self._route_trie = trie
+            self._trie_dirty = False
+
+        def _match_trie(self, node: Dict, segments: List[str], i: int,
+                        method: str, values: List[str]) -> Optional[Tuple]:
+            """Walk the trie; literal segments win over :param captures."""
+            if i == len(segments):
+                for methods, handler, names in node.get(None, ()):
+                    if method in methods:
+                        return handler, dict(zip(names, values))
+                return None
+
+            segment = segments[i]
+            child = node.get(segment)
+            if child is not None:
+                found = self._match_trie(child, segments, i + 1, method, values)
+                if found:
+                    return found
+
+            wildcard = node.get(':')
+            if wildcard is not None and segment:
+                values.append(segment)
+                found = self._match_trie(wildcard, segments, i + 1, method, values)
+                if found:
+                    return found
+                values.pop()
+
+            return None
+
         def _match_route(self, method: str, path: str) -> Optional[Tuple]:
             """Find matching route."""
+            if self._trie_dirty:
+                self._build_route_trie()
+
+            found = self._match_trie(self._route_trie, path.split('/'), 0,
+                                     method, [])
+            if found:
+                return found
+
+            # Fallback for route paths the trie cannot express literally
+            # (regex metacharacters inside a segment).
             for pattern, methods, handler, original_path in self._routes:
                 if method in methods:
-                    match = re.match(pattern, path)
+                    match = pattern.match(path)
                     if match:
                         return handler, match.groupdict()
             return None
         
         def _parse_cookies(self, cookie_header: str) -> Dict[str, str]:
-            """Parse cookie header."""
+            """Parse cookie header with a single split/partition pass.
+
+            SimpleCookie runs a heavy regex per morsel; the server only
+            ever reads plain name=value pairs back, so a manual scan is
+            enough and much cheaper on the per-request path.
+            """
+            if not cookie_header:
+                return {}
+
             cookies = {}
-            if cookie_header:
-                cookie = SimpleCookie()
-                cookie.load(cookie_header)
-                for key, morsel in cookie.items():
-                    cookies[key] = morsel.value
+            for pair in cookie_header.split(';'):
+                name, sep, value = pair.partition('=')
+                if not sep:
+                    continue
+                value = value.strip()
+                if len(value) > 1 and value[0] == '"' and value[-1] == '"':
+                    value = value[1:-1]
+                cookies[name.strip()] = value
             return cookies
         
-        def _parse_body(self, content_type: str, body: bytes) -> Any:
-            """Parse request body based on content type."""
+        def _parse_body(self, content_type: str, body) -> Any:
+            """Parse request body (bytes or memoryview) based on content type."""
             if not body:
                 return {}
-            
+
             if 'application/json' in content_type:
                 try:
-                    return json.loads(body.decode('utf-8'))
-                except json.JSONDecodeError:
+                    return _json_loads(body)
+                except ValueError:  # JSONDecodeError/UnicodeDecodeError
                     return {}
             elif 'application/x-www-form-urlencoded' in content_type:
-                return {k: v[0] if len(v) == 1 else v 
-                        for k, v in parse_qs(body.decode('utf-8')).items()}
+                return {k: v[0] if len(v) == 1 else v
+                        for k, v in parse_qs(str(body, 'utf-8')).items()}
             elif 'multipart/form-data' in content_type:
                 # Parse multipart form data
-                return self._parse_multipart(content_type, body)
+                return self._parse_multipart(content_type, bytes(body))
             else:
-                return body.decode('utf-8', errors='replace')
+                return str(body, 'utf-8', 'replace')
         
         def _parse_multipart(self, content_type: str, body: bytes) -> Dict:
-            """Parse multipart/form-data."""
+            """Parse multipart/form-data.
+
+            Parts are located by scanning boundary offsets with bytes.find
+            instead of body.split, so a large upload is never copied into
+            per-part bytes objects; file contents are zero-copy memoryview
+            slices into the original body.
+            """
             # Extract boundary
-            boundary_match = re.search(r'boundary=([^;]+)', content_type)
+            boundary_match = _BOUNDARY_RE.search(content_type)
             if not boundary_match:
                 return {}
-            
+
             boundary = ('--' + boundary_match.group(1)).encode()
-            parts = body.split(boundary)[1:-1]  # Skip first empty and last closing
-            
+            boundary_len = len(boundary)
+
             result = {}
             files = []
-            
-            for part in parts:
-                if not part.strip():
-                    continue
-                
+
+            view = memoryview(body)
+            pos = body.find(boundary)
+            while pos != -1:
+                part_start = pos + boundary_len
+                part_end = body.find(boundary, part_start)
+                if part_end == -1:
+                    break  # Closing boundary (or truncated body)
+                pos = part_end
+
                 # Split headers and content
-                header_end = part.find(b'\r\n\r\n')
+                header_end = body.find(b'\r\n\r\n', part_start, part_end)
                 if header_end == -1:
                     continue
-                
-                headers = part[:header_end].decode('utf-8')
-                content = part[header_end+4:-2]  # Remove \r\n at end
-                
-                # Parse Content-Disposition
-                disp_match = re.search(r'name="([^"]+)"', headers)
+
+                headers = body[part_start:header_end]
+                # Content runs to the \r\n preceding the next boundary
+                content = view[header_end + 4:part_end - 2]
+
+                # Parse Content-Disposition (name and optional filename in
+                # one scan over the raw header bytes)
+                disp_match = _DISP_RE.search(headers)
                 if not disp_match:
                     continue
-                
-                name = disp_match.group(1)
-                
+
+                name = disp_match.group('name').decode('utf-8')
+
                 # Check if it's a file
-                filename_match = re.search(r'filename="([^"]+)"', headers)
-                if filename_match:
-                    filename = filename_match.group(1)
-                    content_type_match = re.search(r'Content-Type: ([^\r\n]+)', headers)
-                    file_type = content_type_match.group(1) if content_type_match else 'application/octet-stream'
-                    
+                filename = disp_match.group('filename')
+                if filename is not None:
+                    content_type_match = _CT_RE.search(headers)
+                    file_type = content_type_match.group(1).decode('latin-1') \
+                        if content_type_match else 'application/octet-stream'
+
                     files.append({
                         'fieldname': name,
-                        'filename': filename,
+                        'filename': filename.decode('utf-8'),
                         'content': content,
                         'content_type': file_type,
                         'size': len(content)
                     })
                 else:
                     # Regular form field
-                    result[name] = content.decode('utf-8', errors='replace')
-            
+                    result[name] = str(content, 'utf-8', 'replace')
+
             if files:
                 result['_files'] = files
-            
+
             return result
         
         def serve(self, port: int = 8080, host: str = '0.0.0.0') -> None:
@@ -495,24 +894,52 @@ def create_http_module(interpreter) -> Dict[str, Any]:
                     
                     handler, params = result
                     
-                    # Parse request
+                    # Parse request; the body is read into a pooled buffer so
+                    # uploads don't allocate a fresh bytes object per request.
                     content_length = int(self.headers.get('Content-Length', 0))
-                    body = self.rfile.read(content_length) if content_length > 0 else b''
                     content_type = self.headers.get('Content-Type', '')
-                    
-                    # Build request object
-                    request = {
+
+                    if content_length > _MAX_BODY_SIZE:
+                        self._send_error(
+                            413, {'error': 'Request body too large'})
+                        return
+
+                    if content_length > 0:
+                        buf = _rent_body_buffer(content_length)
+                        view = memoryview(buf)[:content_length]
+                        try:
+                            n = self.rfile.readinto(view)
+                            if n < content_length:
+                                # Short read: the client closed before
+                                # sending the declared body. Never parse
+                                # past `n` — the rest of the pooled
+                                # buffer holds a previous request.
+                                self._send_error(
+                                    400, {'error': 'Incomplete request body'})
+                                return
+                            parsed_body = server_instance._parse_body(
+                                content_type, view)
+                        finally:
+                            view.release()
+                            _return_body_buffer(buf)
+                    else:
+                        parsed_body = {}
+
+                    # Build request object; headers/cookies are parsed
+                    # lazily on first access since most handlers skip them
+                    headers_msg = self.headers
+                    request = _LazyRequest({
                         'method': method,
                         'path': path,
                         'params': params,
                         'query': query,
-                        'headers': dict(self.headers),
-                        'body': server_instance._parse_body(content_type, body),
-                        'cookies': server_instance._parse_cookies(
-                            self.headers.get('Cookie', '')
-                        ),
+                        'body': parsed_body,
                         'session': {},
-                    }
+                    }, {
+                        'headers': lambda: dict(headers_msg),
+                        'cookies': lambda: server_instance._parse_cookies(
+                            headers_msg.get('Cookie', '')),
+                    })
                     
                     # Run middleware
                     for mw in server_instance._middleware:
@@ -533,72 +960,123 @@ def create_http_module(interpreter) -> Dict[str, Any]:
                     except Exception as e:
                         self._send_error(500, {'error': str(e)})
                 
+                def _send_raw(self, status, header_items, body=b''):
+                    """Write status line, headers and body in one syscall.
+
+                    Bypasses send_header/end_headers so the whole response
+                    goes out through a single scatter-gather sendmsg
+                    (writev) instead of one write per fragment.
+                    """
+                    status_part = _COMMON_STATUS.get(status)
+                    if status_part is None:
+                        reason = self.responses[status][0] \
+                            if status in self.responses else ''
+                        status_part = f'{status} {reason}'.encode('latin-1')
+
+                    head = [
+                        self.protocol_version.encode('ascii'), b' ',
+                        status_part, b'\r\n',
+                        f'Server: {self.version_string()}\r\n'
+                        f'Date: {self.date_time_string()}\r\n'.encode('latin-1'),
+                    ]
+                    has_length = False
+                    for key, value in header_items:
+                        if key.lower() == 'content-length':
+                            has_length = True
+                        head.append(f'{key}: {value}\r\n'.encode('latin-1'))
+                    if not has_length:
+                        head.append(
+                            f'Content-Length: {len(body)}\r\n'.encode('latin-1'))
+                    head.append(b'\r\n')
+                    header_bytes = b''.join(head)
+
+                    if hasattr(self.connection, 'sendmsg'):
+                        # sendmsg may send only part of the response;
+                        # drain the rest or the body gets truncated
+                        # under the Content-Length already emitted.
+                        sent = self.connection.sendmsg([header_bytes, body])
+                        total = len(header_bytes) + len(body)
+                        if sent < total:
+                            rest = memoryview(header_bytes + body)[sent:]
+                            self.connection.sendall(rest)
+                    else:
+                        self.wfile.write(header_bytes)
+                        if body:
+                            self.wfile.write(body)
+
                 def _send_response(self, response):
                     if response is None:
-                        self.send_response(204)
-                        self.end_headers()
+                        self._send_raw(204, ())
                         return
-                    
+
                     if isinstance(response, dict):
                         status = response.get('status', 200)
                         headers = response.get('headers', {})
                         body = response.get('body', '')
                         content_type = response.get('contentType', 'application/json')
-                        
-                        self.send_response(status)
-                        self.send_header('Content-Type', content_type)
-                        
-                        for key, value in headers.items():
-                            self.send_header(key, value)
-                        
-                        # Handle cookies
-                        if 'cookies' in response:
-                            for name, value in response['cookies'].items():
-                                self.send_header('Set-Cookie', f'{name}={value}')
-                        
-                        self.end_headers()
-                        
+
                         if isinstance(body, dict) or isinstance(body, list):
-                            self.wfile.write(json.dumps(body).encode())
+                            payload = _json_dumps(body)
                         elif isinstance(body, bytes):
-                            self.wfile.write(body)
+                            payload = body
                         else:
-                            self.wfile.write(str(body).encode())
+                            payload = str(body).encode()
+
+                        header_items = [('Content-Type', content_type)]
+                        header_items.extend(headers.items())
+
+                        # Handle cookies
+                        if 'cookies' in response:
+                            for name, value in response['cookies'].items():
+                                header_items.append(('Set-Cookie', f'{name}={value}'))
+
+                        self._send_raw(status, header_items, payload)
                     else:
-                        self.send_response(200)
-                        self.send_header('Content-Type', 'text/plain')
-                        self.end_headers()
-                        self.wfile.write(str(response).encode())
-                
+                        self._send_raw(200, (('Content-Type', 'text/plain'),),
+                                       str(response).encode())
+
                 def _send_error(self, status, body):
-                    self.send_response(status)
-                    self.send_header('Content-Type', 'application/json')
-                    self.end_headers()
-                    self.wfile.write(json.dumps(body).encode())
+                    self._send_raw(status, (('Content-Type', 'application/json'),),
+                                   _json_dumps(body))
                 
                 def _serve_static(self, directory, file_path):
-                    import os
-                    import mimetypes
-                    
                     full_path = os.path.join(directory, file_path)
-                    
+
                     if not os.path.exists(full_path) or not os.path.isfile(full_path):
                         self._send_error(404, {'error': 'File not found'})
                         return
-                    
+
                     mime_type, _ = mimetypes.guess_type(full_path)
                     if not mime_type:
                         mime_type = 'application/octet-stream'
-                    
+
                     try:
                         with open(full_path, 'rb') as f:
-                            content = f.read()
-                        
-                        self.send_response(200)
-                        self.send_header('Content-Type', mime_type)
-                        self.send_header('Content-Length', len(content))
-                        self.end_headers()
-                        self.wfile.write(content)
+                            size = os.fstat(f.fileno()).st_size
+
+                            self.send_response(200)
+                            self.send_header('Content-Type', mime_type)
+                            self.send_header('Content-Length', size)
+                            self.end_headers()
+                            self.wfile.flush()
+
+                            offset = 0
+                            try:
+                                # Zero-copy: the kernel moves page-cache
+                                # pages straight to the socket, no
+                                # userspace buffer of the whole file.
+                                while offset < size:
+                                    sent = os.sendfile(
+                                        self.connection.fileno(),
+                                        f.fileno(), offset, size - offset)
+                                    if sent == 0:
+                                        break
+                                    offset += sent
+                            except (AttributeError, OSError):
+                                # sendfile unavailable (platform or
+                                # wrapped socket) - stream manually
+                                f.seek(offset)
+                                self.wfile.write(f.read())
                     except IOError:
                         self._send_error(500, {'error': 'Error reading file'})
                 
@@ -621,7 +1099,10 @@ def create_http_module(interpreter) -> Dict[str, Any]:
                     self._handle_request('OPTIONS')
             
             print(f"RIFT server running on http://{host}:{port}")
-            self._server = HTTPServer((host, port), RiftHandler)
+            # ThreadingHTTPServer keeps the accept loop free while handlers
+            # block on I/O; a slow request no longer stalls every other client.
+            self._server = ThreadingHTTPServer((host, port), RiftHandler)
+            self._server.daemon_threads = True
             
             try:
                 self._server.serve_forever()
@@ -724,68 +1205,124 @@ def create_http_module(interpreter) -> Dict[str, Any]:
     # ========================================================================
     
     def http_request(url: str, options: Dict = None) -> Dict:
-        """Make HTTP request."""
-        import urllib.request
-        import urllib.error
-        
+        """Make HTTP request over a pooled keep-alive connection.
+
+        The returned 'body' is parsed JSON for application/json
+        responses, str for text types, and raw bytes otherwise.
+        """
         options = options or {}
         method = options.get('method', 'GET').upper()
         headers = options.get('headers', {})
         body = options.get('body', None)
         timeout = options.get('timeout', 30)
-        
+
         # Prepare body
         data = None
         if body:
             if isinstance(body, dict):
-                data = json.dumps(body).encode('utf-8')
+                data = _json_dumps(body)
                 if 'Content-Type' not in headers:
                     headers['Content-Type'] = 'application/json'
             elif isinstance(body, str):
                 data = body.encode('utf-8')
             elif isinstance(body, bytes):
                 data = body
-        
-        # Create request
-        req = urllib.request.Request(url, data=data, headers=headers, method=method)
-        
-        try:
-            with urllib.request.urlopen(req, timeout=timeout) as response:
-                response_body = response.read()
-                content_type = response.headers.get('Content-Type', '')
-                
-                # Parse response body
-                if 'application/json' in content_type:
-                    try:
-                        parsed_body = json.loads(response_body.decode('utf-8'))
-                    except json.JSONDecodeError:
-                        parsed_body = response_body.decode('utf-8')
-                else:
-                    parsed_body = response_body.decode('utf-8', errors='replace')
-                
+
+        for _hop in range(6):  # bounded redirect chain
+            parsed = urlparse(url)
+            scheme = parsed.scheme or 'http'
+            host = parsed.hostname or ''
+            port = parsed.port or (443 if scheme == 'https' else 80)
+            path = parsed.path or '/'
+            if parsed.query:
+                path = f'{path}?{parsed.query}'
+
+            response = None
+            error = None
+            # Two attempts: a pooled connection may have been closed by
+            # the server while idle, which surfaces on first use.
+            for _attempt in range(2):
+                conn, reused = _CLIENT_POOL.acquire(scheme, host, port, timeout)
+                try:
+                    conn.request(method, path, body=data, headers=headers)
+                    response = conn.getresponse()
+                    response_body = response.read()
+                    break
+                except (HTTPException, OSError) as e:
+                    conn.close()
+                    error = e
+                    # A fresh connection's failure may have reached the
+                    # server, so never replay a non-idempotent request
+                    # over one; only a stale pooled socket justifies a
+                    # resend.
+                    if not reused and method not in _IDEMPOTENT_METHODS:
+                        break
+            if response is None:
                 return {
-                    'status': response.status,
-                    'headers': dict(response.headers),
-                    'body': parsed_body,
-                    'ok': 200 <= response.status < 300
+                    'status': 0,
+                    'headers': {},
+                    'body': None,
+                    'ok': False,
+                    'error': str(error)
                 }
-        except urllib.error.HTTPError as e:
-            response_body = e.read()
-            return {
-                'status': e.code,
-                'headers': dict(e.headers),
-                'body': response_body.decode('utf-8', errors='replace'),
-                'ok': False,
-                'error': str(e)
-            }
-        except urllib.error.URLError as e:
-            return {
-                'status': 0,
-                'headers': {},
-                'body': None,
-                'ok': False,
-                'error': str(e)
+
+            # Hand the socket back unless the server is closing it
+            if response.will_close:
+                conn.close()
+            else:
+                _CLIENT_POOL.release(scheme, host, port, conn)
+
+            # Follow redirects like urllib did: 303 (and 301/302 after a
+            # POST) downgrade to GET and drop the body
+            if response.status in (301, 302, 303, 307, 308):
+                location = response.headers.get('Location')
+                if location:
+                    url = urljoin(url, location)
+                    if response.status == 303 or (
+                            response.status in (301, 302) and method == 'POST'):
+                        method = 'GET'
+                        data = None
+                    continue
+
+            content_type = response.headers.get('Content-Type', '')
+
+            # Parse response body: JSON parses, declared-text decodes,
+            # everything else stays bytes — no O(N) UTF-8 validation
+            # pass over binary downloads
+            if 'application/json' in content_type:
+                try:
+                    parsed_body = _json_loads(response_body)
+                except ValueError:
+                    parsed_body = response_body.decode('utf-8')
+            elif content_type.startswith('text/') or 'charset=' in content_type:
+                charset = 'utf-8'
+                if 'charset=' in content_type:
+                    charset = (content_type.rsplit('charset=', 1)[1]
+                               .split(';')[0].strip() or 'utf-8')
+                try:
+                    parsed_body = response_body.decode(charset, errors='replace')
+                except LookupError:  # bogus charset label
+                    parsed_body = response_body.decode('utf-8', errors='replace')
+            else:
+                parsed_body = response_body
+
+            result = {
+                'status': response.status,
+                'headers': dict(response.headers),
+                'body': parsed_body,
+                'ok': 200 <= response.status < 300
             }
+            if not result['ok']:
+                result['error'] = f'HTTP Error {response.status}: {response.reason}'
+            return result
+
+        return {
+            'status': 0,
+            'headers': {},
+            'body': None,
+            'ok': False,
+            'error': 'Too many redirects'
+        }
     
     def http_get(url: str, headers: Dict = None) -> Dict:
         """Make GET request."""
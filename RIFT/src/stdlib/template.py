@@ -5,110 +5,202 @@ Simple template engine for server-side rendering.
 """
 
 import re
+from collections.abc import Mapping
 from typing import Dict, Any
 
+# Distinguishes "key absent" from "key set to None" when the loop
+# evaluator saves and restores a shadowed context entry.
+_MISSING = object()
+
+# Compiled once at import instead of per render call
+_VAR_RE = re.compile(r'\{\{\s*(.+?)\s*\}\}')
+
+# One combined pattern: a single linear pass yields both {{ var }} and
+# {% tag %} tokens with the literals between them. else/endif are plain
+# tokens handled by the parser stack, so nothing ever backtracks over
+# the template body.
+_TOKEN_RE = re.compile(r'\{\{\s*(.+?)\s*\}\}|\{%\s*(.+?)\s*%\}', re.DOTALL)
+
 
 def create_template_module(interpreter) -> Dict[str, Any]:
     """Create the Template module for RIFT."""
     
     class Template:
-        """Simple template engine."""
-        
+        """Simple template engine.
+
+        The template text is compiled once in __init__ into a list of
+        ops; render() just walks the ops, so repeated renders never
+        re-scan the source. Op shapes:
+
+            ('lit', text)
+            ('var', key)
+            ('if', condition_key, then_ops, else_ops_or_None)
+            ('for', item_name, items_key, body_ops)
+        """
+
         def __init__(self, template: str):
             self.template = template
-        
+            # Block-free templates with plain {{var}} substitutions can
+            # skip the op walker entirely and render through CPython's
+            # C-level str.format_map machinery.
+            self._fmt = None
+            if '{%' not in template:
+                self._fmt = self._compile_format(template)
+            self._ops = None if self._fmt is not None \
+                else self._compile(template)
+
+        @staticmethod
+        def _compile_format(text: str):
+            """Build a str.format equivalent of the template.
+
+            Returns None when any variable is not a bare identifier
+            (dotted paths collide with format's own field syntax), in
+            which case the caller falls back to the compiled ops.
+            """
+            parts = []
+            pos = 0
+            for match in _VAR_RE.finditer(text):
+                key = match.group(1)
+                if not key.isidentifier():
+                    return None
+                parts.append(text[pos:match.start()]
+                             .replace('{', '{{').replace('}', '}}'))
+                parts.append('{' + key + '}')
+                pos = match.end()
+            parts.append(text[pos:].replace('{', '{{').replace('}', '}}'))
+            return ''.join(parts)
+
+        def _compile(self, text: str) -> list:
+            """Parse the template into a nested op list."""
+            ops: list = []
+            current = ops
+            stack = []  # (open block node, list to restore on close)
+
+            pos = 0
+            for match in _TOKEN_RE.finditer(text):
+                if match.start() > pos:
+                    current.append(('lit', text[pos:match.start()]))
+                pos = match.end()
+
+                var_key, tag = match.group(1), match.group(2)
+                if var_key is not None:
+                    # Dotted paths are split once here, not per lookup
+                    current.append(('var', tuple(var_key.split('.'))))
+                    continue
+
+                keyword, _, rest = tag.partition(' ')
+                if keyword == 'if' and rest:
+                    node = ['if', tuple(rest.strip().split('.')), [], None]
+                    current.append(node)
+                    stack.append((node, current))
+                    current = node[2]
+                elif keyword == 'else' and stack and stack[-1][0][0] == 'if':
+                    node = stack[-1][0]
+                    node[3] = []
+                    current = node[3]
+                elif keyword == 'endif' and stack and stack[-1][0][0] == 'if':
+                    _node, current = stack.pop()
+                elif keyword == 'for':
+                    item_name, sep, items_key = rest.partition(' in ')
+                    if not sep:
+                        current.append(('lit', match.group(0)))
+                        continue
+                    node = ['for', item_name.strip(),
+                            tuple(items_key.strip().split('.')), []]
+                    current.append(node)
+                    stack.append((node, current))
+                    current = node[3]
+                elif keyword == 'endfor' and stack and stack[-1][0][0] == 'for':
+                    _node, current = stack.pop()
+                else:
+                    # Unknown or mismatched tag: keep it verbatim
+                    current.append(('lit', match.group(0)))
+
+            if pos < len(text):
+                current.append(('lit', text[pos:]))
+
+            return ops
+
         def render(self, context: Dict[str, Any]) -> str:
             """Render template with context."""
-            result = self.template
-            
-            # Replace {{ variable }}
-            def replace_var(match):
-                key = match.group(1).strip()
-                value = self._get_nested_value(context, key)
-                return str(value) if value is not None else ''
-            
-            result = re.sub(r'\{\{\s*(.+?)\s*\}\}', replace_var, result)
-            
-            # Handle {% if condition %}
-            result = self._process_conditionals(result, context)
-            
-            # Handle {% for item in items %}
-            result = self._process_loops(result, context)
-            
-            return result
-        
-        def _get_nested_value(self, obj: Any, key: str) -> Any:
-            """Get nested value from object using dot notation."""
-            keys = key.split('.')
+            if self._fmt is not None:
+                return self._fmt.format_map(_FormatContext(context))
+            parts: list = []
+            self._eval_ops(self._ops, context, parts)
+            return ''.join(parts)
+
+        def _eval_ops(self, ops: list, context: Dict, out: list) -> None:
+            """Evaluate an op list, appending rendered text to out."""
+            for op in ops:
+                kind = op[0]
+                if kind == 'lit':
+                    out.append(op[1])
+                elif kind == 'var':
+                    value = self._resolve(context, op[1])
+                    if value is not None:
+                        out.append(str(value))
+                elif kind == 'if':
+                    value = self._resolve(context, op[1])
+                    if value and value != '0' and value != 'false':
+                        self._eval_ops(op[2], context, out)
+                    elif op[3] is not None:
+                        self._eval_ops(op[3], context, out)
+                elif kind == 'for':
+                    items = self._resolve(context, op[2])
+                    if not items or not isinstance(items, (list, tuple)):
+                        continue
+                    # Write the loop variable straight into the context
+                    # and restore it afterwards: one dict slot touched
+                    # per iteration, and lookups in the body stay plain
+                    # single-dict hits. Safe because evaluation is
+                    # synchronous.
+                    name = op[1]
+                    body = op[3]
+                    saved = context.get(name, _MISSING)
+                    try:
+                        for item in items:
+                            context[name] = item
+                            self._eval_ops(body, context, out)
+                    finally:
+                        if saved is _MISSING:
+                            del context[name]
+                        else:
+                            context[name] = saved
+
+        @staticmethod
+        def _resolve(obj: Any, path: tuple, _dict=dict, _getattr=getattr) -> Any:
+            """Walk a pre-split dotted path through mappings/attributes."""
             value = obj
-            
-            for k in keys:
-                if isinstance(value, dict):
+            for k in path:
+                if value.__class__ is _dict:
+                    value = value.get(k)
+                elif isinstance(value, Mapping):
                     value = value.get(k)
                 else:
-                    value = getattr(value, k, None)
-                
+                    value = _getattr(value, k, None)
+
                 if value is None:
                     return None
-            
+
             return value
+
+        def _get_nested_value(self, obj: Any, key: str) -> Any:
+            """Get nested value from object using dot notation."""
+            return self._resolve(obj, tuple(key.split('.')))
         
-        def _process_conditionals(self, text: str, context: Dict) -> str:
-            """Process {% if %} {% else %} {% endif %} blocks."""
-            pattern = r'\{%\s*if\s+(.+?)\s*%\}(.*?)(?:\{%\s*else\s*%\}(.*?))?\{%\s*endif\s*%\}'
-            
-            def replace_if(match):
-                condition = match.group(1).strip()
-                if_block = match.group(2)
-                else_block = match.group(3) or ''
-                
-                # Evaluate condition
-                try:
-                    value = self._get_nested_value(context, condition)
-                    if value and value != '0' and value != 'false':
-                        return if_block
-                    else:
-                        return else_block
-                except:
-                    return else_block
-            
-            return re.sub(pattern, replace_if, text, flags=re.DOTALL)
-        
-        def _process_loops(self, text: str, context: Dict) -> str:
-            """Process {% for item in items %} blocks."""
-            pattern = r'\{%\s*for\s+(\w+)\s+in\s+(.+?)\s*%\}(.*?)\{%\s*endfor\s*%\}'
-            
-            def replace_loop(match):
-                item_name = match.group(1).strip()
-                items_key = match.group(2).strip()
-                loop_block = match.group(3)
-                
-                items = self._get_nested_value(context, items_key)
-                if not items or not isinstance(items, (list, tuple)):
-                    return ''
-                
-                result = []
-                for item in items:
-                    loop_context = context.copy()
-                    loop_context[item_name] = item
-                    
-                    # Render loop block with item context
-                    rendered = loop_block
-                    for key, value in loop_context.items():
-                        if isinstance(value, dict):
-                            for sub_key, sub_value in value.items():
-                                pattern = f'{{{{{key}.{sub_key}}}}}'
-                                rendered = rendered.replace(pattern, str(sub_value))
-                        
-                        pattern = f'{{{{{key}}}}}'
-                        rendered = rendered.replace(pattern, str(value))
-                    
-                    result.append(rendered)
-                
-                return ''.join(result)
-            
-            return re.sub(pattern, replace_loop, text, flags=re.DOTALL)
-    
+    class _FormatContext:
+        """format_map adapter matching the op walker's lookup rules:
+        missing or None values render as the empty string."""
+
+        __slots__ = ('_context',)
+
+        def __init__(self, context: Dict[str, Any]):
+            self._context = context
+
+        def __getitem__(self, key: str) -> Any:
+            value = Template._resolve(self._context, (key,))
+            return '' if value is None else value
+
     def render_template(template: str, context: Dict[str, Any]) -> str:
         """Quick render helper."""
         return Template(template).render(context)
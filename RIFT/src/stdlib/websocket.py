@@ -4,20 +4,113 @@ RIFT Standard Library - WebSocket Module
 WebSocket server and client functionality.
 """
 
+import re
 import socket
 import hashlib
-import base64
 import struct
-import threading
+from binascii import b2a_base64
+import selectors
 from typing import Dict, Any, Optional, Callable
 
+# Fixed GUID from RFC 6455; appended to the client key before hashing.
+_WS_MAGIC = b'258EAFA5-E914-47DA-95CA-C5AB0DC85B11'
+
+# Pulls the client key straight out of the raw handshake bytes — one
+# C-level scan instead of decoding and splitting every header line.
+_WS_KEY_RE = re.compile(rb'Sec-WebSocket-Key:\s*([^\r\n]+)', re.IGNORECASE)
+
+# Precomposed handshake response: only the accept key varies, so the
+# reply is one bytes %-interpolation instead of str formatting + encode.
+_RESP_FMT = (b'HTTP/1.1 101 Switching Protocols\r\n'
+             b'Upgrade: websocket\r\n'
+             b'Connection: Upgrade\r\n'
+             b'Sec-WebSocket-Accept: %b\r\n'
+             b'\r\n')
+
+# Pre-compiled extended-length codecs: unpack_from reads straight out
+# of the frame buffer with no intermediate slice.
+_LEN16 = struct.Struct('>H')
+_LEN64 = struct.Struct('>Q')
+
+try:
+    import numpy as _np
+except ImportError:  # NumPy is optional
+    _np = None
+
+if _np is not None:
+    try:
+        from numba import njit as _njit
+
+        @_njit(cache=True, boundscheck=False)
+        def _unmask_jit(buf, mask):  # pragma: no cover - needs numba
+            for i in range(buf.size):
+                buf[i] ^= mask[i & 3]
+    except ImportError:  # Numba is optional too
+        _unmask_jit = None
+else:
+    _unmask_jit = None
+
+
+def _unmask(data, mask: bytes) -> None:
+    """XOR-unmask a frame payload (bytearray or writable memoryview) in place.
+
+    Prefers the Numba-compiled kernel (LLVM auto-vectorizes the byte
+    loop), then NumPy's vectorized uint8 XOR. Without either, the whole
+    payload is XORed as a single big integer (SWAR-style): CPython's
+    bignum XOR runs at C speed, so the interpreter dispatches a handful
+    of operations instead of one per byte.
+    """
+    length = len(data)
+    if length == 0:
+        return
+    if length >= 512 and _np is not None:
+        arr = _np.frombuffer(data, dtype=_np.uint8)
+        if _unmask_jit is not None:
+            _unmask_jit(arr, _np.frombuffer(mask, dtype=_np.uint8))
+        else:
+            arr ^= _np.resize(_np.frombuffer(mask, dtype=_np.uint8), length)
+        return
+    full_mask = mask * (length // 4) + mask[:length % 4]
+    data[:] = (int.from_bytes(data, 'little') ^
+               int.from_bytes(full_mask, 'little')).to_bytes(length, 'little')
+
+
+class _ClientState:
+    """Per-connection read buffer and handshake progress.
+
+    The event loop accumulates whatever the socket delivers into
+    ``buffer``; the handshake and frame parsers consume complete units
+    from the front of it, so a frame split across packets just waits
+    for the next readable event.
+    """
+
+    __slots__ = ('sock', 'client_id', 'buffer', 'handshaken',
+                 'recv_buf', 'recv_mv')
+
+    def __init__(self, sock: socket.socket, client_id: str):
+        self.sock = sock
+        self.client_id = client_id
+        self.buffer = bytearray()
+        self.handshaken = False
+        # Reused scratch buffer for recv_into: the kernel copies into
+        # the same 64 KiB region every read instead of handing back a
+        # freshly allocated bytes object per call.
+        self.recv_buf = bytearray(65536)
+        self.recv_mv = memoryview(self.recv_buf)
+
 
 def create_websocket_module(interpreter) -> Dict[str, Any]:
     """Create the WebSocket module for RIFT."""
-    
+
     class WebSocketServer:
-        """Simple WebSocket server."""
-        
+        """WebSocket server driven by a single selector loop.
+
+        One thread multiplexes every connection through
+        selectors.DefaultSelector (epoll on Linux) instead of spawning
+        an OS thread per client, so idle connections cost a few hundred
+        bytes of buffer state rather than a thread stack.
+        """
+
         def __init__(self, host: str = '0.0.0.0', port: int = 8765):
             self.host = host
             self.port = port
@@ -25,173 +118,260 @@ def create_websocket_module(interpreter) -> Dict[str, Any]:
             self._handlers: Dict[str, Callable] = {}
             self._running = False
             self._server_socket = None
-        
+            self._selector = None
+
         def on_connect(self, handler):
             """Register connection handler."""
             self._handlers['connect'] = handler
-        
+
         def on_message(self, handler):
             """Register message handler."""
             self._handlers['message'] = handler
-        
+
         def on_disconnect(self, handler):
             """Register disconnect handler."""
             self._handlers['disconnect'] = handler
-        
+
         def broadcast(self, message: str):
             """Broadcast message to all clients."""
             for client_id, client_socket in list(self._clients.items()):
                 try:
                     self._send_message(client_socket, message)
-                except:
+                except OSError:
                     del self._clients[client_id]
-        
+
         def send(self, client_id: str, message: str):
             """Send message to specific client."""
             if client_id in self._clients:
                 self._send_message(self._clients[client_id], message)
-        
+
         def _send_message(self, sock: socket.socket, message: str):
-            """Send WebSocket frame."""
+            """Send WebSocket frame.
+
+            Client sockets are non-blocking for the read loop, so the
+            socket is flipped to blocking around the write to let
+            sendall drain a full frame.
+            """
             data = message.encode('utf-8')
-            header = bytearray([0x81])  # Text frame
-            
+
             length = len(data)
             if length <= 125:
-                header.append(length)
+                header = bytes([0x81, length])  # Text frame
             elif length <= 65535:
-                header.append(126)
-                header.extend(struct.pack('>H', length))
+                header = bytes([0x81, 126]) + _LEN16.pack(length)
             else:
-                header.append(127)
-                header.extend(struct.pack('>Q', length))
-            
-            sock.sendall(header + data)
-        
-        def _receive_message(self, sock: socket.socket) -> Optional[str]:
-            """Receive WebSocket frame."""
+                header = bytes([0x81, 127]) + _LEN64.pack(length)
+
+            sock.setblocking(True)
+            try:
+                # Scatter/gather write: header and payload go out in one
+                # syscall without being concatenated into a third buffer.
+                sent = sock.sendmsg([header, data])
+                total = len(header) + length
+                if sent < total:
+                    rest = memoryview(header + data)[sent:]
+                    sock.sendall(rest)
+            finally:
+                sock.setblocking(False)
+
+        def _accept(self):
+            """Accept a new connection and register it with the loop."""
+            try:
+                client_socket, client_addr = self._server_socket.accept()
+            except OSError:
+                return
+            client_socket.setblocking(False)
+            try:
+                client_socket.setsockopt(socket.IPPROTO_TCP,
+                                         socket.TCP_NODELAY, 1)
+            except OSError:
+                pass
+            client_id = f"{client_addr[0]}:{client_addr[1]}"
+            state = _ClientState(client_socket, client_id)
+            self._selector.register(client_socket, selectors.EVENT_READ, state)
+
+        def _on_readable(self, state: _ClientState):
+            """Pull available bytes and advance the connection state."""
+            try:
+                n = state.sock.recv_into(state.recv_mv)
+            except BlockingIOError:
+                return
+            except OSError:
+                self._drop_client(state)
+                return
+            if not n:
+                self._drop_client(state)
+                return
+
+            state.buffer += state.recv_mv[:n]
+
+            if not state.handshaken:
+                if not self._try_handshake(state):
+                    return
+
+            try:
+                self._drain_frames(state)
+            except Exception:
+                # A malformed frame (e.g. bad UTF-8) or a handler error
+                # costs that client, never the whole loop.
+                self._drop_client(state)
+
+        def _try_handshake(self, state: _ClientState) -> bool:
+            """Complete the handshake once the full request has arrived."""
+            end = state.buffer.find(b'\r\n\r\n')
+            if end < 0:
+                if len(state.buffer) > 16384:
+                    # Never-ending header block: give up on the client
+                    self._drop_client(state)
+                return False
+
+            key_match = _WS_KEY_RE.search(state.buffer, 0, end + 4)
+            if not key_match:
+                del state.buffer[:end + 4]
+                self._drop_client(state)
+                return False
+            # Copy the key out before consuming the request bytes: the
+            # match object reads from the live buffer.
+            key = bytes(key_match.group(1)).strip()
+            del state.buffer[:end + 4]
+
+            # Generate accept key in one shot; usedforsecurity=False
+            # lets OpenSSL pick its fastest SHA-1 even on FIPS builds
+            # (this digest is protocol plumbing, not security).
+            # b2a_base64 is the C routine under base64.b64encode, minus
+            # the wrapper and the trailing newline.
+            digest = hashlib.sha1(key + _WS_MAGIC,
+                                  usedforsecurity=False).digest()
+            accept = b2a_base64(digest, newline=False)
+
+            state.sock.setblocking(True)
             try:
-                header = sock.recv(2)
-                if len(header) != 2:
+                state.sock.sendall(_RESP_FMT % accept)
+            finally:
+                state.sock.setblocking(False)
+
+            state.handshaken = True
+            self._clients[state.client_id] = state.sock
+
+            if 'connect' in self._handlers:
+                interpreter._call(self._handlers['connect'],
+                                  [state.client_id], None)
+            return True
+
+        def _parse_frame(self, buf: bytearray):
+            """Pop one complete frame off the buffer, or None if short.
+
+            The payload is unmasked in place inside the buffer and text
+            frames are decoded straight out of a memoryview, so the
+            bytes make a single pass with no intermediate copy between
+            the socket and the str handed to the handler.
+            """
+            if len(buf) < 2:
+                return None
+
+            opcode = buf[0] & 0x0F
+            masked = buf[1] & 0x80
+            length = buf[1] & 0x7F
+            offset = 2
+
+            if length == 126:
+                if len(buf) < 4:
                     return None
-                
-                opcode = header[0] & 0x0F
-                masked = header[1] & 0x80
-                length = header[1] & 0x7F
-                
-                if length == 126:
-                    length = struct.unpack('>H', sock.recv(2))[0]
-                elif length == 127:
-                    length = struct.unpack('>Q', sock.recv(8))[0]
-                
-                mask = sock.recv(4) if masked else None
-                data = bytearray(sock.recv(length))
-                
-                if masked and mask:
-                    for i in range(len(data)):
-                        data[i] ^= mask[i % 4]
-                
-                if opcode == 0x01:  # Text frame
-                    return data.decode('utf-8')
-                elif opcode == 0x08:  # Close frame
+                length = _LEN16.unpack_from(buf, 2)[0]
+                offset = 4
+            elif length == 127:
+                if len(buf) < 10:
                     return None
-                
-                return None
-            except:
+                length = _LEN64.unpack_from(buf, 2)[0]
+                offset = 10
+
+            mask = None
+            if masked:
+                if len(buf) < offset + 4:
+                    return None
+                mask = bytes(buf[offset:offset + 4])
+                offset += 4
+
+            end = offset + length
+            if len(buf) < end:
                 return None
-        
-        def _handle_client(self, client_socket: socket.socket, client_addr):
-            """Handle client connection."""
-            client_id = f"{client_addr[0]}:{client_addr[1]}"
-            
-            try:
-                # WebSocket handshake
-                request = client_socket.recv(1024).decode('utf-8')
-                
-                # Extract WebSocket key
-                key_match = None
-                for line in request.split('\r\n'):
-                    if 'Sec-WebSocket-Key' in line:
-                        key_match = line.split(': ')[1]
-                        break
-                
-                if not key_match:
-                    client_socket.close()
+
+            text = None
+            # The views must be released before the del below, or the
+            # bytearray refuses to resize under an exported buffer.
+            with memoryview(buf) as mv:
+                with mv[offset:end] as payload:
+                    if mask:
+                        _unmask(payload, mask)
+                    if opcode == 0x01:  # Text frame
+                        text = str(payload, 'utf-8')
+            del buf[:end]
+
+            return opcode, text
+
+        def _drain_frames(self, state: _ClientState):
+            """Dispatch every complete frame sitting in the buffer."""
+            while True:
+                frame = self._parse_frame(state.buffer)
+                if frame is None:
                     return
-                
-                # Generate accept key
-                magic = '258EAFA5-E914-47DA-95CA-C5AB0DC85B11'
-                accept = base64.b64encode(
-                    hashlib.sha1((key_match + magic).encode()).digest()
-                ).decode()
-                
-                # Send handshake response
-                response = (
-                    'HTTP/1.1 101 Switching Protocols\r\n'
-                    'Upgrade: websocket\r\n'
-                    'Connection: Upgrade\r\n'
-                    f'Sec-WebSocket-Accept: {accept}\r\n'
-                    '\r\n'
-                )
-                client_socket.sendall(response.encode())
-                
-                # Store client
-                self._clients[client_id] = client_socket
-                
-                # Call connect handler
-                if 'connect' in self._handlers:
-                    interpreter._call(self._handlers['connect'], [client_id], None)
-                
-                # Message loop
-                while self._running:
-                    message = self._receive_message(client_socket)
-                    if message is None:
-                        break
-                    
-                    if 'message' in self._handlers:
-                        interpreter._call(self._handlers['message'], 
-                                        [client_id, message], None)
-                
-            except:
+
+                opcode, text = frame
+                if opcode == 0x08:  # Close frame
+                    self._drop_client(state)
+                    return
+                if text is not None and 'message' in self._handlers:
+                    interpreter._call(self._handlers['message'],
+                                      [state.client_id, text], None)
+
+        def _drop_client(self, state: _ClientState):
+            """Unregister, notify and close a connection."""
+            try:
+                self._selector.unregister(state.sock)
+            except (KeyError, ValueError, OSError):
                 pass
-            finally:
-                # Call disconnect handler
-                if 'disconnect' in self._handlers:
-                    interpreter._call(self._handlers['disconnect'], [client_id], None)
-                
-                if client_id in self._clients:
-                    del self._clients[client_id]
-                
-                client_socket.close()
-        
+
+            if state.handshaken and 'disconnect' in self._handlers:
+                interpreter._call(self._handlers['disconnect'],
+                                  [state.client_id], None)
+
+            self._clients.pop(state.client_id, None)
+            state.sock.close()
+
         def start(self):
             """Start WebSocket server."""
             self._running = True
             self._server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
             self._server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
             self._server_socket.bind((self.host, self.port))
-            self._server_socket.listen(5)
-            
+            self._server_socket.listen(128)
+            self._server_socket.setblocking(False)
+
+            self._selector = selectors.DefaultSelector()
+            self._selector.register(self._server_socket,
+                                    selectors.EVENT_READ, None)
+
             print(f"WebSocket server running on ws://{self.host}:{self.port}")
-            
+
             while self._running:
                 try:
-                    client_socket, client_addr = self._server_socket.accept()
-                    thread = threading.Thread(
-                        target=self._handle_client,
-                        args=(client_socket, client_addr)
-                    )
-                    thread.daemon = True
-                    thread.start()
-                except:
+                    events = self._selector.select(timeout=1.0)
+                except OSError:
                     break
-        
+                for key, _events in events:
+                    if key.data is None:
+                        self._accept()
+                    else:
+                        self._on_readable(key.data)
+
         def stop(self):
             """Stop WebSocket server."""
             self._running = False
             if self._server_socket:
                 self._server_socket.close()
-    
+            if self._selector:
+                self._selector.close()
+
     return {
         'WebSocketServer': WebSocketServer,
         'createServer': lambda host='0.0.0.0', port=8765: WebSocketServer(host, port)